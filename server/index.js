@@ -28,14 +28,20 @@ if (!HA_URL || !HA_TOKEN) {
   process.exit(1);
 }
 
+// How long a fetched /api/states payload may be reused before refetching
+const STATES_CACHE_TTL = 10 * 1000;
+
 class HomeAssistantClient {
   constructor(baseUrl, token, timeout = 30000) {
     this.baseUrl = baseUrl.replace(/\/$/, '');
-    this.headers = {
+    // Shared across all requests; Content-Type is only sent on writes
+    this.headers = Object.freeze({
       'Authorization': `Bearer ${token}`,
-      'Content-Type': 'application/json',
-    };
+      'Accept': 'application/json',
+    });
     this.timeout = timeout;
+    this.statesCache = null;
+    this.statesPromise = null;
   }
 
   async makeRequest(endpoint, options = {}) {
@@ -47,7 +53,7 @@ class HomeAssistantClient {
       
       const response = await fetch(url, {
         ...options,
-        headers: { ...this.headers, ...options.headers },
+        headers: options.headers ? { ...this.headers, ...options.headers } : this.headers,
         signal: controller.signal,
       });
       
@@ -111,7 +117,73 @@ class HomeAssistantClient {
   }
 
   async getStates() {
-    return await this.makeRequest('/api/states');
+    // LLM-driven exploration fires states-backed tools in quick succession
+    // with different filters; reuse the multi-MB payload for a few seconds.
+    // Concurrent callers share one in-flight request instead of stampeding.
+    if (this.statesCache && Date.now() - this.statesCache.time < STATES_CACHE_TTL) {
+      return this.statesCache.states;
+    }
+
+    if (!this.statesPromise) {
+      this.statesPromise = this.makeRequest('/api/states')
+        .then((states) => {
+          // Bucket by domain once per refresh so domain-filtered lookups
+          // are O(result size) instead of a scan over every state
+          const byDomain = new Map();
+          for (const state of states) {
+            const domain = (state.entity_id || '').split('.')[0];
+            let bucket = byDomain.get(domain);
+            if (!bucket) {
+              bucket = [];
+              byDomain.set(domain, bucket);
+            }
+            bucket.push(state);
+          }
+          this.statesCache = { time: Date.now(), states, byDomain };
+          return states;
+        })
+        .finally(() => {
+          this.statesPromise = null;
+        });
+    }
+
+    return await this.statesPromise;
+  }
+
+  async getStatesByDomain(domain) {
+    await this.getStates();
+    return this.statesCache.byDomain.get(domain) || [];
+  }
+
+  async getFilteredEntityIds(domainFilter, searchTerm) {
+    // Render the filter inside Home Assistant's template engine so only the
+    // matching entity_ids cross the wire instead of the full states payload
+    const source = domainFilter
+      ? `states.${domainFilter.replace(/[^a-z0-9_]/gi, '')}`
+      : 'states';
+
+    let expression;
+    if (searchTerm) {
+      // The Jinja 'search' test takes a regex, so escape regex
+      // metacharacters to keep substring semantics, then escape
+      // backslashes and quotes for the template string literal
+      const query = searchTerm
+        .replace(/[.*+?^${}()|[\]\\]/g, '\\$&')
+        .replace(/\\/g, '\\\\')
+        .replace(/"/g, '\\"');
+      expression =
+        `(${source} | selectattr('entity_id', 'search', "${query}", ignorecase=true) | list + ` +
+        `${source} | selectattr('name', 'search', "${query}", ignorecase=true) | list) ` +
+        `| unique(attribute='entity_id') | map(attribute='entity_id') | list`;
+    } else {
+      expression = `${source} | map(attribute='entity_id') | list`;
+    }
+
+    return await this.makeRequest('/api/template', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ template: `{{ ${expression} | to_json }}` }),
+    });
   }
 
   async getEntityState(entityId) {
@@ -143,6 +215,7 @@ class HomeAssistantClient {
     
     return await this.makeRequest(`/api/services/${domain}/${service}`, {
       method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data),
     });
   }
@@ -170,28 +243,115 @@ class HomeAssistantClient {
 const haClient = new HomeAssistantClient(HA_URL, HA_TOKEN, REQUEST_TIMEOUT);
 
 // Helper functions
+const TIME_FORMATS = [
+  /^\d{4}-\d{2}-\d{2}$/,
+  /^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$/,
+  /^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$/,
+];
+
+const PARSE_TIME_CACHE_MAX = 1024;
+const parseTimeCache = new Map();
+
 function parseTimeString(timeStr) {
+  // MCP clients reuse the same start/end strings across repeated calls,
+  // so memoize successful parses (bounded, oldest entry evicted first)
+  const cached = parseTimeCache.get(timeStr);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  let parsed;
   try {
-    const formats = [
-      /^\d{4}-\d{2}-\d{2}$/,
-      /^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$/,
-      /^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$/,
-    ];
-    
-    for (const format of formats) {
+    let matched = false;
+    for (const format of TIME_FORMATS) {
       if (format.test(timeStr)) {
-        return new Date(timeStr).toISOString();
+        matched = true;
+        parsed = new Date(timeStr).toISOString();
+        break;
       }
     }
-    
-    // Try parsing as ISO
-    return new Date(timeStr.replace('Z', '+00:00')).toISOString();
+
+    if (!matched) {
+      // Try parsing as ISO
+      parsed = new Date(timeStr.replace('Z', '+00:00')).toISOString();
+    }
   } catch (error) {
     throw new McpError(
       ErrorCode.InvalidParams,
       `Invalid time format: ${timeStr}. Use YYYY-MM-DD or ISO format.`
     );
   }
+
+  if (parseTimeCache.size >= PARSE_TIME_CACHE_MAX) {
+    parseTimeCache.delete(parseTimeCache.keys().next().value);
+  }
+  parseTimeCache.set(timeStr, parsed);
+  return parsed;
+}
+
+function jsonContent(payload) {
+  // Compact serialization for data-heavy responses; pretty-printing large
+  // history/logbook lists roughly doubles both CPU time and payload size
+  return {
+    content: [
+      {
+        type: 'text',
+        text: JSON.stringify(payload),
+      },
+    ],
+  };
+}
+
+// TTL cache for history/statistics/logbook responses. Windows that end in
+// the past are immutable, so identical queries can skip the round-trip and
+// re-parse entirely; windows touching "now" are never cached.
+const RESPONSE_CACHE_MAX = 256;
+const RESPONSE_CACHE_TTL = 300 * 1000;
+const responseCache = new Map();
+
+function responseCacheKey(endTime, ...parts) {
+  if (!endTime || Date.parse(endTime) >= Date.now()) {
+    return null;
+  }
+  return parts.join('|');
+}
+
+function responseCacheGet(key) {
+  const entry = responseCache.get(key);
+  if (!entry) {
+    return null;
+  }
+  if (Date.now() - entry.time > RESPONSE_CACHE_TTL) {
+    responseCache.delete(key);
+    return null;
+  }
+  return entry.value;
+}
+
+function responseCacheSet(key, value) {
+  if (responseCache.size >= RESPONSE_CACHE_MAX) {
+    responseCache.delete(responseCache.keys().next().value);
+  }
+  responseCache.set(key, { time: Date.now(), value });
+}
+
+// Bound fan-out so batched tools don't overwhelm Home Assistant
+const FAN_OUT_CONCURRENCY = 8;
+
+// First slice of a logbook window to probe before fetching the whole thing
+const LOGBOOK_PROBE_WINDOW = 60 * 60 * 1000;
+
+async function mapWithConcurrency(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index]);
+    }
+  });
+  await Promise.all(workers);
+  return results;
 }
 
 function validateEntityId(entityId) {
@@ -237,6 +397,21 @@ server.setRequestHandler(ListToolsRequestSchema, async () => {
           required: ['entity_id'],
         },
       },
+      {
+        name: 'get_multi_entity_history',
+        description: 'Get historical data for multiple Home Assistant entities in one call',
+        inputSchema: {
+          type: 'object',
+          properties: {
+            entity_ids: { type: 'array', items: { type: 'string' }, description: 'List of Home Assistant entity IDs' },
+            hours_back: { type: 'number', default: 24, description: 'Number of hours back from now' },
+            start_time: { type: 'string', description: 'Start time in YYYY-MM-DD or ISO format' },
+            end_time: { type: 'string', description: 'End time in YYYY-MM-DD or ISO format' },
+            minimal_response: { type: 'boolean', default: true, description: 'Return minimal data for better performance' },
+          },
+          required: ['entity_ids'],
+        },
+      },
       {
         name: 'get_entity_statistics',
         description: 'Get long-term statistics for a Home Assistant entity',
@@ -387,153 +562,325 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
       case 'get_entity_history': {
         validateEntityId(args.entity_id);
         
+        const now = Date.now();
         let startTime;
         if (args.start_time) {
           startTime = parseTimeString(args.start_time);
         } else {
           const hoursBack = args.hours_back || 24;
-          startTime = new Date(Date.now() - hoursBack * 60 * 60 * 1000).toISOString();
+          startTime = new Date(now - hoursBack * 60 * 60 * 1000).toISOString();
         }
         
         const endTime = args.end_time ? parseTimeString(args.end_time) : null;
+        const minimalResponse = args.minimal_response !== false;
+
+        const cacheKey = responseCacheKey(
+          endTime, 'history', args.entity_id, startTime, endTime, minimalResponse
+        );
+        if (cacheKey) {
+          const cached = responseCacheGet(cacheKey);
+          if (cached) {
+            return cached;
+          }
+        }
+
         const history = await haClient.getEntityHistory(
           args.entity_id,
           startTime,
           endTime,
-          args.minimal_response !== false
+          minimalResponse
         );
-        
-        return {
-          content: [
-            {
-              type: 'text',
-              text: JSON.stringify({
-                entity_id: args.entity_id,
-                data_points: history.length,
-                start_time: startTime,
-                end_time: endTime || new Date().toISOString(),
-                history: history,
-              }, null, 2),
-            },
-          ],
-        };
+
+        const result = jsonContent({
+          entity_id: args.entity_id,
+          data_points: history.length,
+          start_time: startTime,
+          end_time: endTime || new Date(now).toISOString(),
+          history: history,
+        });
+        if (cacheKey) {
+          responseCacheSet(cacheKey, result);
+        }
+        return result;
+      }
+
+      case 'get_multi_entity_history': {
+        const entityIds = args.entity_ids || [];
+        for (const entityId of entityIds) {
+          validateEntityId(entityId);
+        }
+
+        const now = Date.now();
+        let startTime;
+        if (args.start_time) {
+          startTime = parseTimeString(args.start_time);
+        } else {
+          const hoursBack = args.hours_back || 24;
+          startTime = new Date(now - hoursBack * 60 * 60 * 1000).toISOString();
+        }
+
+        const endTime = args.end_time ? parseTimeString(args.end_time) : null;
+        const minimalResponse = args.minimal_response !== false;
+
+        // Fan out over the shared connection pool; per-entity failures are
+        // reported inline instead of failing the whole batch
+        const entities = await mapWithConcurrency(entityIds, FAN_OUT_CONCURRENCY, async (entityId) => {
+          try {
+            const history = await haClient.getEntityHistory(entityId, startTime, endTime, minimalResponse);
+            return { entity_id: entityId, data_points: history.length, history: history };
+          } catch (error) {
+            return { entity_id: entityId, error: error.message };
+          }
+        });
+
+        return jsonContent({
+          entity_count: entityIds.length,
+          start_time: startTime,
+          end_time: endTime || new Date(now).toISOString(),
+          entities: entities,
+        });
       }
 
       case 'get_entity_statistics': {
         validateEntityId(args.entity_id);
         
+        const now = Date.now();
         let startTime;
         if (args.start_time) {
           startTime = parseTimeString(args.start_time);
         } else {
           const daysBack = args.days_back || 7;
-          startTime = new Date(Date.now() - daysBack * 24 * 60 * 60 * 1000).toISOString();
+          startTime = new Date(now - daysBack * 24 * 60 * 60 * 1000).toISOString();
         }
         
         const endTime = args.end_time ? parseTimeString(args.end_time) : null;
         const period = args.period || 'hour';
-        
+
+        const cacheKey = responseCacheKey(
+          endTime, 'statistics', args.entity_id, startTime, endTime, period
+        );
+        if (cacheKey) {
+          const cached = responseCacheGet(cacheKey);
+          if (cached) {
+            return cached;
+          }
+        }
+
         const stats = await haClient.getEntityStatistics(args.entity_id, startTime, endTime, period);
         const entityStats = stats[args.entity_id] || [];
-        
-        return {
-          content: [
-            {
-              type: 'text',
-              text: JSON.stringify({
-                entity_id: args.entity_id,
-                period: period,
-                start_time: startTime,
-                end_time: endTime || new Date().toISOString(),
-                statistics: entityStats,
-              }, null, 2),
-            },
-          ],
-        };
+
+        const result = jsonContent({
+          entity_id: args.entity_id,
+          period: period,
+          start_time: startTime,
+          end_time: endTime || new Date(now).toISOString(),
+          statistics: entityStats,
+        });
+        if (cacheKey) {
+          responseCacheSet(cacheKey, result);
+        }
+        return result;
       }
 
       case 'get_available_entities': {
-        const states = await haClient.getStates();
-        let filteredEntities = [];
-        
-        for (const state of states) {
-          const entityId = state.entity_id || '';
-          const attributes = state.attributes || {};
-          const friendlyName = attributes.friendly_name || entityId;
-          
-          // Apply domain filter
-          if (args.domain_filter && !entityId.startsWith(`${args.domain_filter}.`)) {
-            continue;
+        const limit = args.limit || 100;
+
+        if (args.domain_filter) {
+          // The cached domain index beats a template round-trip here
+          const domainStates = await haClient.getStatesByDomain(args.domain_filter);
+          const needle = args.search_term ? args.search_term.toLowerCase() : null;
+          const entities = [];
+
+          for (const state of domainStates) {
+            const entityId = state.entity_id || '';
+            const attributes = state.attributes || {};
+            const friendlyName = attributes.friendly_name || entityId;
+
+            if (needle &&
+                !entityId.toLowerCase().includes(needle) &&
+                !friendlyName.toLowerCase().includes(needle)) {
+              continue;
+            }
+
+            entities.push({
+              entity_id: entityId,
+              friendly_name: friendlyName,
+              domain: args.domain_filter,
+              state: state.state || 'unknown',
+              unit_of_measurement: attributes.unit_of_measurement || '',
+            });
+
+            if (entities.length >= limit) {
+              break;
+            }
           }
-          
-          // Apply search filter
-          if (args.search_term) {
-            const searchLower = args.search_term.toLowerCase();
-            if (!entityId.toLowerCase().includes(searchLower) &&
-                !friendlyName.toLowerCase().includes(searchLower)) {
+
+          return jsonContent({
+            total_entities: entities.length,
+            entities: entities,
+          });
+        }
+
+        if (args.search_term) {
+          // Filter server-side, then hydrate only the surviving entities
+          let entityIds = null;
+          try {
+            entityIds = await haClient.getFilteredEntityIds(
+              args.domain_filter,
+              args.search_term
+            );
+          } catch (error) {
+            // Template rendering is best-effort; fall back to the local
+            // substring filter if HA rejects the expression
+          }
+
+          if (entityIds !== null) {
+            const matchedStates = await mapWithConcurrency(
+              entityIds.slice(0, limit),
+              FAN_OUT_CONCURRENCY,
+              async (entityId) => {
+                try {
+                  return await haClient.getEntityState(entityId);
+                } catch (error) {
+                  // Entity may have disappeared between the template render
+                  // and the state fetch; drop it instead of failing the call
+                  return null;
+                }
+              }
+            );
+
+            const entities = matchedStates.filter(Boolean).map((state) => {
+              const entityId = state.entity_id || '';
+              const attributes = state.attributes || {};
+              return {
+                entity_id: entityId,
+                friendly_name: attributes.friendly_name || entityId,
+                domain: entityId.split('.')[0],
+                state: state.state || 'unknown',
+                unit_of_measurement: attributes.unit_of_measurement || '',
+              };
+            });
+
+            return jsonContent({
+              total_entities: entities.length,
+              entities: entities,
+            });
+          }
+
+          const states = await haClient.getStates();
+          const needle = args.search_term.toLowerCase();
+          const matches = [];
+
+          for (const state of states) {
+            const entityId = state.entity_id || '';
+            const attributes = state.attributes || {};
+            const friendlyName = attributes.friendly_name || entityId;
+
+            if (!entityId.toLowerCase().includes(needle) &&
+                !friendlyName.toLowerCase().includes(needle)) {
               continue;
             }
+
+            matches.push({
+              entity_id: entityId,
+              friendly_name: friendlyName,
+              domain: entityId.split('.')[0],
+              state: state.state || 'unknown',
+              unit_of_measurement: attributes.unit_of_measurement || '',
+            });
+
+            if (matches.length >= limit) {
+              break;
+            }
           }
-          
+
+          return jsonContent({
+            total_entities: matches.length,
+            entities: matches,
+          });
+        }
+
+        const states = await haClient.getStates();
+        const filteredEntities = [];
+
+        for (const state of states) {
+          const entityId = state.entity_id || '';
+          const attributes = state.attributes || {};
+
           filteredEntities.push({
             entity_id: entityId,
-            friendly_name: friendlyName,
+            friendly_name: attributes.friendly_name || entityId,
             domain: entityId.split('.')[0],
             state: state.state || 'unknown',
             unit_of_measurement: attributes.unit_of_measurement || '',
           });
+
+          if (filteredEntities.length >= limit) {
+            break;
+          }
         }
-        
-        // Apply limit
-        const limit = args.limit || 100;
-        if (filteredEntities.length > limit) {
-          filteredEntities = filteredEntities.slice(0, limit);
-        }
-        
-        return {
-          content: [
-            {
-              type: 'text',
-              text: JSON.stringify({
-                total_entities: filteredEntities.length,
-                entities: filteredEntities,
-              }, null, 2),
-            },
-          ],
-        };
+
+        return jsonContent({
+          total_entities: filteredEntities.length,
+          entities: filteredEntities,
+        });
       }
 
       case 'get_logbook_entries': {
+        const now = Date.now();
         let startTime;
         if (args.start_time) {
           startTime = parseTimeString(args.start_time);
         } else {
           const hoursBack = args.hours_back || 24;
-          startTime = new Date(Date.now() - hoursBack * 60 * 60 * 1000).toISOString();
+          startTime = new Date(now - hoursBack * 60 * 60 * 1000).toISOString();
         }
         
         const endTime = args.end_time ? parseTimeString(args.end_time) : null;
-        let logbookData = await haClient.getLogbook(startTime, endTime, args.entity_id);
-        
-        // Apply limit
         const limit = args.limit || 50;
+
+        const cacheKey = responseCacheKey(
+          endTime, 'logbook', args.entity_id || '', startTime, endTime, limit
+        );
+        if (cacheKey) {
+          const cached = responseCacheGet(cacheKey);
+          if (cached) {
+            return cached;
+          }
+        }
+
+        const windowStart = Date.parse(startTime);
+        const windowEnd = endTime ? Date.parse(endTime) : now;
+
+        // Probe the first slice of the window; if it already holds enough
+        // entries for the limit, the rest is never downloaded or parsed
+        let logbookData = null;
+        if (windowEnd - windowStart > LOGBOOK_PROBE_WINDOW) {
+          const probeEnd = new Date(windowStart + LOGBOOK_PROBE_WINDOW).toISOString();
+          const probe = await haClient.getLogbook(startTime, probeEnd, args.entity_id);
+          if (probe.length >= limit) {
+            logbookData = probe;
+          }
+        }
+        if (logbookData === null) {
+          logbookData = await haClient.getLogbook(startTime, endTime, args.entity_id);
+        }
+
+        // Apply limit
         if (logbookData.length > limit) {
           logbookData = logbookData.slice(0, limit);
         }
-        
-        return {
-          content: [
-            {
-              type: 'text',
-              text: JSON.stringify({
-                entry_count: logbookData.length,
-                start_time: startTime,
-                end_time: endTime || new Date().toISOString(),
-                entries: logbookData,
-              }, null, 2),
-            },
-          ],
-        };
+
+        const result = jsonContent({
+          entry_count: logbookData.length,
+          start_time: startTime,
+          end_time: endTime || new Date(now).toISOString(),
+          entries: logbookData,
+        });
+        if (cacheKey) {
+          responseCacheSet(cacheKey, result);
+        }
+        return result;
       }
 
       case 'get_entity': {
@@ -764,10 +1111,7 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
       }
 
       case 'domain_summary_tool': {
-        const states = await haClient.getStates();
-        const domainEntities = states.filter(state => 
-          state.entity_id && state.entity_id.startsWith(`${args.domain}.`)
-        );
+        const domainEntities = await haClient.getStatesByDomain(args.domain);
         
         let sampleEntities = [];
         if (args.include_entities !== false) {
@@ -796,10 +1140,7 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
       }
 
       case 'list_automations': {
-        const states = await haClient.getStates();
-        const automations = states.filter(state => 
-          state.entity_id && state.entity_id.startsWith('automation.')
-        );
+        const automations = await haClient.getStatesByDomain('automation');
         
         const automationList = automations.map(automation => ({
           entity_id: automation.entity_id,